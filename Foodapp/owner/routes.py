@@ -1,9 +1,11 @@
 # owner/routes.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from data import restaurants
 import os
 from werkzeug.utils import secure_filename
+from owner.uploads import (UploadError, create_session, load_session, write_chunk,
+                           complete_session, abort_session)
 
 # --- Blueprint Setup ---
 owner_bp = Blueprint('owner', __name__,
@@ -112,6 +114,75 @@ def manage_ar(rest_id, dish_id):
 
     return render_template('manage_ar.html', restaurant=rest, dish=dish)
 
+
+# --- NEW: Resumable chunked upload API for AR files ---
+def upload_error_response(e):
+    body = {'success': False, 'error': e.message}
+    if e.offset is not None:
+        body['offset'] = e.offset
+    return jsonify(body), e.status
+
+@owner_bp.route('/<int:rest_id>/manage_ar/<int:dish_id>/uploads', methods=['POST'])
+def start_ar_upload(rest_id, dish_id):
+    rest, dish = find_dish(dish_id)
+    if not dish:
+        return jsonify({'success': False, 'error': 'Dish not found.'}), 404
+
+    data = request.get_json(silent=True) or {}
+    try:
+        session = create_session(dish_id, data.get('kind'), data.get('filename'), data.get('size'),
+                                 data.get('sha256'))
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({'success': True, 'upload_id': session['id'], 'offset': 0}), 201
+
+@owner_bp.route('/uploads/<upload_id>', methods=['GET'])
+def ar_upload_status(upload_id):
+    # Lets a client that lost its connection find out where to resume from
+    try:
+        session = load_session(upload_id)
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({'success': True, 'offset': session['offset'], 'size': session['size']})
+
+@owner_bp.route('/uploads/<upload_id>', methods=['PUT'])
+def upload_ar_chunk(upload_id):
+    # Chunk body is raw bytes; offset and sha256 come in as headers
+    try:
+        offset = int(request.headers.get('X-Upload-Offset', ''))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Missing X-Upload-Offset header.'}), 400
+    try:
+        session = load_session(upload_id)
+        new_offset = write_chunk(session, offset, request.stream,
+                                 request.headers.get('X-Chunk-Checksum'))
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({'success': True, 'offset': new_offset, 'size': session['size']})
+
+@owner_bp.route('/uploads/<upload_id>/complete', methods=['POST'])
+def complete_ar_upload(upload_id):
+    try:
+        session = load_session(upload_id)
+        rest, dish = find_dish(session['dish_id'])
+        if not dish:
+            abort_session(session)
+            raise UploadError("Dish not found.", status=404)
+        url = complete_session(session, dish['id'])
+    except UploadError as e:
+        return upload_error_response(e)
+
+    dish['ar_target' if session['kind'] == 'target' else 'ar_model'] = url
+    return jsonify({'success': True, 'url': url})
+
+@owner_bp.route('/uploads/<upload_id>', methods=['DELETE'])
+def abort_ar_upload(upload_id):
+    try:
+        abort_session(load_session(upload_id))
+    except UploadError as e:
+        return upload_error_response(e)
+    return jsonify({'success': True})
+
 # --- Updated Route with search functionality ---
 @owner_bp.route('/<int:rest_id>/manage_dishes')
 def manage_dishes(rest_id):
@@ -0,0 +1,204 @@
+# owner/uploads.py
+
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, uploads run unlocked
+    fcntl = None
+
+# Where in-progress uploads live until they are complete
+UPLOAD_TMP_DIR = 'uploads/tmp'
+
+# Size of the blocks read off the request stream (never the whole chunk)
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Uploads with no new chunk for this long are treated as abandoned
+UPLOAD_MAX_AGE = 24 * 3600
+
+# Allowed extensions, largest accepted size and final folder for each kind of AR file
+UPLOAD_KINDS = {
+    'target': {'folder': 'uploads/targets', 'extensions': ('.mind',), 'max_size': 20 * 1024 * 1024},
+    'model': {'folder': 'uploads/models', 'extensions': ('.glb', '.gltf'), 'max_size': 200 * 1024 * 1024},
+}
+
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.offset = offset
+
+
+# --- Helpers for the on-disk session files ---
+def _meta_path(upload_id):
+    return os.path.join(UPLOAD_TMP_DIR, f"{upload_id}.json")
+
+def _part_path(upload_id):
+    return os.path.join(UPLOAD_TMP_DIR, f"{upload_id}.part")
+
+@contextmanager
+def _locked_part(upload_id):
+    # One writer per upload: a timed-out request still streaming must not
+    # interleave with the client's retry (or truncate under it)
+    try:
+        f = open(_part_path(upload_id), 'r+b')
+    except FileNotFoundError:
+        raise UploadError("Upload not found.", status=404)
+    with f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError("Another request is writing this upload; retry shortly.",
+                                  status=409)
+        yield f
+
+def _save_session(session):
+    # Write the metadata next to the data so any worker can resume the upload
+    tmp = _meta_path(session['id']) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(session, f)
+    os.replace(tmp, _meta_path(session['id']))
+
+
+def create_session(dish_id, kind, filename, size, sha256):
+    if kind not in UPLOAD_KINDS:
+        raise UploadError("Unknown upload kind.")
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext not in UPLOAD_KINDS[kind]['extensions']:
+        raise UploadError(f"Invalid file type for {kind}.")
+    if isinstance(size, bool) or not isinstance(size, int) or size <= 0:
+        raise UploadError("File size must be a positive integer.")
+    if size > UPLOAD_KINDS[kind]['max_size']:
+        raise UploadError(f"File is too large for {kind}.", status=413)
+    # Checked against the assembled file before it replaces the dish's file
+    if not isinstance(sha256, str) or not SHA256_RE.match(sha256.lower()):
+        raise UploadError("sha256 of the whole file is required.")
+
+    os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+    cleanup_expired()
+    session = {
+        'id': uuid.uuid4().hex,
+        'dish_id': dish_id,
+        'kind': kind,
+        'ext': ext,
+        'size': size,
+        'sha256': sha256.lower(),
+    }
+    # Create the empty part file; its length is the resume offset
+    open(_part_path(session['id']), 'wb').close()
+    _save_session(session)
+    return session
+
+
+def load_session(upload_id):
+    # Upload ids are hex uuids; reject anything else before touching the disk
+    if not upload_id.isalnum():
+        raise UploadError("Upload not found.", status=404)
+    try:
+        with open(_meta_path(upload_id)) as f:
+            session = json.load(f)
+    except FileNotFoundError:
+        raise UploadError("Upload not found.", status=404)
+    session['offset'] = os.path.getsize(_part_path(upload_id))
+    return session
+
+
+def write_chunk(session, offset, stream, checksum):
+    """Append one chunk from `stream` to the part file, verifying its sha256."""
+    with _locked_part(session['id']) as f:
+        # Re-read under the lock: another request may have just written
+        current = os.fstat(f.fileno()).st_size
+        if offset != current:
+            # Client is out of sync (e.g. a retried chunk); tell it where to resume
+            raise UploadError("Offset mismatch.", status=409, offset=current)
+
+        digest = hashlib.sha256()
+        written = 0
+        f.seek(offset)
+        try:
+            while True:
+                block = stream.read(STREAM_BLOCK_SIZE)
+                if not block:
+                    break
+                written += len(block)
+                if offset + written > session['size']:
+                    raise UploadError("Chunk exceeds declared file size.", status=413, offset=offset)
+                digest.update(block)
+                f.write(block)
+
+            if checksum and digest.hexdigest() != checksum.lower():
+                raise UploadError("Checksum mismatch.", status=422, offset=offset)
+        except BaseException:
+            # Bad chunk or dropped connection: throw away the partial chunk so
+            # the client resends it from the same offset
+            f.truncate(offset)
+            raise
+
+    session['offset'] = offset + written
+    return session['offset']
+
+
+def complete_session(session, dish_id):
+    """Check a fully received upload against its sha256, move it into place
+    and return its URL path."""
+    if 'sha256' not in session:
+        # Started before whole-file checksums were required; it can't be verified
+        abort_session(session)
+        raise UploadError("Upload expired; please start it again.", status=410)
+
+    with _locked_part(session['id']) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size != session['size']:
+            raise UploadError("Upload is incomplete.", status=409, offset=size)
+
+        digest = hashlib.sha256()
+        for block in iter(lambda: f.read(STREAM_BLOCK_SIZE), b''):
+            digest.update(block)
+        if digest.hexdigest() != session['sha256']:
+            # Something went wrong along the way; start the file over
+            f.truncate(0)
+            raise UploadError("File checksum mismatch; upload it again.", status=422, offset=0)
+
+        folder = UPLOAD_KINDS[session['kind']]['folder']
+        os.makedirs(folder, exist_ok=True)
+        filename = f"{session['kind']}_{dish_id}{session['ext']}"
+        filepath = os.path.join(folder, filename)
+        # Atomic swap: readers see either the old file or the new one, never a partial
+        os.replace(_part_path(session['id']), filepath)
+    os.remove(_meta_path(session['id']))
+    return f'/{filepath}'
+
+
+def cleanup_expired(max_age=UPLOAD_MAX_AGE):
+    """Delete part and metadata files that haven't been written to in max_age seconds."""
+    if not os.path.isdir(UPLOAD_TMP_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(UPLOAD_TMP_DIR):
+        path = os.path.join(UPLOAD_TMP_DIR, name)
+        upload_id = name.split('.', 1)[0]
+        # A session is as old as its last chunk, so go by the part file when there is one
+        part = _part_path(upload_id)
+        try:
+            last_write = os.path.getmtime(part if os.path.exists(part) else path)
+            if last_write < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def abort_session(session):
+    for path in (_part_path(session['id']), _meta_path(session['id'])):
+        if os.path.exists(path):
+            os.remove(path)
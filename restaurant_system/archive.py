@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Order archival for Restaurant Management System
+Moves paid orders older than ARCHIVE_AFTER_DAYS (and their items) out of the
+live order tables so the staff and manager views stay fast. Run it from cron,
+e.g. nightly: python archive.py
+"""
+
+import heapq
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import g
+from models import (db, Order, OrderItem, ArchivedOrder, ArchivedOrderItem, IdempotencyKey, KitchenTicket,
+                    RestaurantInfo)
+from tenancy import scoped
+
+ORDER_COLUMNS = ('id', 'restaurant_id', 'table_number', 'customer_id', 'status', 'created_at', 'total_amount')
+ITEM_COLUMNS = ('id', 'order_id', 'dish_id', 'quantity', 'price')
+
+
+def _rows(objects, columns, **extra):
+    return [dict({column: getattr(obj, column) for column in columns}, **extra) for obj in objects]
+
+
+def archive_paid_orders(restaurant_id, older_than, batch_size=500):
+    """Archive one restaurant's paid orders created before now - older_than,
+    batch_size orders at a time. Returns the number of orders moved.
+
+    Each batch is copied and committed before the live rows are deleted in a
+    second commit, so a failure (the archive may be another database) can at
+    worst leave an order in both places, never in neither."""
+    g.restaurant_id = restaurant_id
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - older_than
+    moved = 0
+
+    while True:
+        orders = (Order.query
+                  .filter(Order.restaurant_id == restaurant_id, Order.status == 'paid',
+                          Order.created_at < cutoff)
+                  .order_by(Order.id)
+                  .limit(batch_size)
+                  .all())
+        if not orders:
+            break
+        order_ids = [order.id for order in orders]
+        items = OrderItem.query.filter(OrderItem.order_id.in_(order_ids)).all()
+
+        # A batch interrupted between the two commits is already archived;
+        # only copy what is missing. Order ids repeat across restaurants when
+        # each has its own database, so the archive is keyed by restaurant too
+        archived_ids = {row.id for row in ArchivedOrder.query.filter(
+            ArchivedOrder.restaurant_id == restaurant_id, ArchivedOrder.id.in_(order_ids))}
+        order_rows = [row for row in _rows(orders, ORDER_COLUMNS) if row['id'] not in archived_ids]
+        item_rows = [row for row in _rows(items, ITEM_COLUMNS, restaurant_id=restaurant_id)
+                     if row['order_id'] not in archived_ids]
+        if order_rows:
+            db.session.execute(db.insert(ArchivedOrder), order_rows)
+        if item_rows:
+            db.session.execute(db.insert(ArchivedOrderItem), item_rows)
+        db.session.commit()
+
+        db.session.execute(db.delete(IdempotencyKey).where(IdempotencyKey.order_id.in_(order_ids)))
+        db.session.execute(db.delete(KitchenTicket).where(KitchenTicket.order_id.in_(order_ids)))
+        db.session.execute(db.delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        db.session.execute(db.delete(Order).where(Order.id.in_(order_ids)))
+        db.session.commit()
+        db.session.expunge_all()
+        moved += len(order_ids)
+
+    return moved
+
+
+def _newest_first(order):
+    return order.created_at or datetime.min, order.id
+
+
+def paid_order_history(page=1, per_page=50):
+    """One page of the current restaurant's paid orders from the live and
+    archive tables, newest first. Each table returns only its newest
+    page * per_page rows (sorted by the created_at indexes) and the two
+    sorted lists are merged, so the archive's size doesn't matter."""
+    limit = page * per_page
+    live = (scoped(Order).filter_by(status='paid')
+            .order_by(Order.created_at.desc(), Order.id.desc()).limit(limit).all())
+    archived = (scoped(ArchivedOrder)
+                .order_by(ArchivedOrder.created_at.desc(), ArchivedOrder.id.desc()).limit(limit).all())
+
+    orders, seen = [], set()
+    for order in heapq.merge(live, archived, key=_newest_first, reverse=True):
+        # Skip orders caught between the archive's copy and delete commits
+        if (order.id, order.created_at) not in seen:
+            seen.add((order.id, order.created_at))
+            orders.append(order)
+    return orders[limit - per_page:limit]
+
+
+def find_order(order_id):
+    """Look an order of the current restaurant up in the live table, then in the archive."""
+    return (scoped(Order).filter_by(id=order_id).first()
+            or scoped(ArchivedOrder).filter_by(id=order_id).first())
+
+
+def run():
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        older_than = timedelta(days=app.config['ARCHIVE_AFTER_DAYS'])
+        restaurant_ids = [row.id for row in RestaurantInfo.query.all()]
+        for restaurant_id in restaurant_ids:
+            moved = archive_paid_orders(restaurant_id, older_than, app.config['ARCHIVE_BATCH_SIZE'])
+            print(f"Restaurant {restaurant_id}: archived {moved} paid orders.")
+
+if __name__ == '__main__':
+    run()
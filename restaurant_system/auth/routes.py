@@ -0,0 +1,101 @@
+# auth/routes.py
+import math
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, make_response
+from flask_login import LoginManager, login_user, login_required, logout_user, current_user
+from models import db, User
+from tenancy import scoped, current_restaurant_id
+from ratelimit import rate_limit, concurrency_limit
+from functools import wraps
+
+auth_bp = Blueprint('auth', __name__)
+
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
+
+@login_manager.user_loader
+def load_user(user_id):
+    # Ids are '<restaurant_id>:<user id>' (see User.get_id); a session from
+    # another restaurant does not log the user in here
+    restaurant_id, _, id = user_id.partition(':')
+    if not id or restaurant_id != str(current_restaurant_id()):
+        return None
+    try:
+        return scoped(User).filter_by(id=int(id)).first()
+    except ValueError:
+        return None
+
+def role_required(role):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_user.is_authenticated or current_user.role != role:
+                flash('You do not have permission to access this page.', 'danger')
+                return redirect(url_for('auth.login'))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def login_throttled(retry_after):
+    # The login page is a form, so answer with the form and a message, not JSON
+    flash('Too many login attempts. Please wait a minute and try again.', 'danger')
+    response = make_response(render_template('auth/login.html'), 429)
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+# Authentication routes
+@auth_bp.route('/login', methods=['GET', 'POST'])
+@rate_limit('login', on_limit=login_throttled)
+@concurrency_limit('login', methods=('POST',), on_limit=login_throttled)
+def login():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        user = scoped(User).filter_by(username=username).first()
+        
+        if user and user.check_password(password):
+            login_user(user)
+            next_page = request.args.get('next')
+            
+            if user.role == 'customer':
+                return redirect(next_page or url_for('customer.customer_dashboard'))
+            elif user.role == 'staff':
+                return redirect(next_page or url_for('staff.staff_dashboard'))
+            elif user.role == 'manager':
+                return redirect(next_page or url_for('manager.manager_dashboard'))
+        else:
+            flash('Invalid username or password', 'danger')
+    
+    return render_template('auth/login.html')
+
+@auth_bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        role = request.form.get('role', 'customer')
+        
+        if scoped(User).filter_by(username=username).first():
+            flash('Username already exists', 'danger')
+            return redirect(url_for('auth.register'))
+        
+        if scoped(User).filter_by(email=email).first():
+            flash('Email already exists', 'danger')
+            return redirect(url_for('auth.register'))
+        
+        user = User(restaurant_id=current_restaurant_id(), username=username, email=email, role=role)
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        
+        flash('Registration successful. Please login.', 'success')
+        return redirect(url_for('auth.login'))
+    
+    return render_template('auth/register.html')
+
+@auth_bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('auth.login'))
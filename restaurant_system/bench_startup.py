@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for Restaurant Management System
+Starts a fresh interpreter per run, like a new worker, and times importing
+the app module, building the app with create_app() and serving the first
+request. Usage: python bench_startup.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+WORKER = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+application = app.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+t2 = time.perf_counter()
+application.test_client().get('/login')
+t3 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'create_app': t2 - t1, 'first_request': t3 - t2, 'total': t3 - t0}))
+"""
+
+
+def run(runs=10):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', WORKER], cwd=HERE, check=True,
+                                capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"Cold start over {runs} fresh interpreters (median / max, ms):")
+    for phase in ('import', 'create_app', 'first_request', 'total'):
+        times = [result[phase] * 1000 for result in results]
+        print(f"  {phase:<14} {statistics.median(times):8.1f} / {max(times):8.1f}")
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
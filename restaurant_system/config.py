@@ -4,4 +4,47 @@ import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///restaurant.db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Restaurant used when a request does not name one
+    DEFAULT_RESTAURANT_ID = int(os.environ.get('DEFAULT_RESTAURANT_ID') or 1)
+    # Optional per-restaurant database, e.g. 'sqlite:///tenants/restaurant_{restaurant_id}.db'
+    TENANT_DATABASE_URI = os.environ.get('TENANT_DATABASE_URI')
+    # Number of reverse proxies in front of the app whose X-Forwarded-* headers
+    # are trusted (werkzeug ProxyFix); 0 means requests come straight from clients
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT') or 0)
+    # Token buckets per route: key -> (tokens refilled per second, burst size).
+    # A whole dining room usually shares one address (restaurant Wi-Fi, NAT), so
+    # per-IP buckets are only a loose ceiling and orders are limited per user/table
+    RATELIMIT_ENABLED = True
+    RATELIMIT_BACKEND = None  # dotted path to a backend class; in-memory by default
+    RATELIMITS = {
+        'login': {'ip': (120 / 60, 60), 'user_ip': (5 / 60, 5)},
+        'place_order': {'user': (10 / 60, 5), 'table': (20 / 60, 10)},
+        'batch': {'user': (30 / 60, 15)},
+    }
+    # Max requests in flight per worker for expensive routes
+    CONCURRENCY_LIMITS = {'login': 4, 'place_order': 8, 'batch': 8}
+    # Completed order responses kept in memory for Idempotency-Key retries
+    IDEMPOTENCY_CACHE_SIZE = 10000
+    IDEMPOTENCY_TTL = 24 * 3600
+    # Paid orders older than this move to the archive tables (see archive.py)
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS') or 1)
+    ARCHIVE_BATCH_SIZE = 500
+    # Optional separate database for archived orders; may contain {restaurant_id}
+    ARCHIVE_DATABASE_URI = os.environ.get('ARCHIVE_DATABASE_URI')
+    # Co-purchase suggestions on the dish page (see recommendations.py)
+    RECOMMENDATION_COUNT = 4
+    RECOMMENDATION_MIN_SUPPORT = 2  # orders a pair needs before it is suggested
+    # /api/batch and the compact /api/menu payload
+    BATCH_MAX_OPS = 50
+    MENU_CACHE_TTL = 30  # seconds; edits in this worker invalidate immediately
+    # Kitchen stations: which dish categories each prepares and its prep time
+    KITCHEN_STATIONS = {
+        'drinks': {'categories': ['drinks'], 'prep_minutes': 3},
+        'grill': {'categories': ['breakfast', 'lunch', 'dinner', 'special', 'sides'], 'prep_minutes': 15},
+        'dessert': {'categories': ['dessert'], 'prep_minutes': 8},
+    }
+    KITCHEN_DEFAULT_STATION = 'grill'  # for categories not listed above
+    # How often a worker re-checks its queues against the database for tickets
+    # finished elsewhere or committed out of id order (seconds)
+    KITCHEN_RECONCILE_SECONDS = 5
\ No newline at end of file
@@ -11,21 +11,42 @@ from datetime import datetime
 # Add the current directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db
+from flask import g
+from app import create_app
+from models import db
 from models import User, Dish, RestaurantInfo
 
 def init_db():
     """Initialize the database with sample data"""
+    app = create_app()
     with app.app_context():
         # Create all tables
         db.create_all()
         print("Created database tables.")
         
         # Check if we already have data
-        if User.query.first() is not None:
+        if db.session.get(RestaurantInfo, app.config['DEFAULT_RESTAURANT_ID']) is not None:
             print("Database already contains data. Skipping sample data insertion.")
             return
         
+        # Create restaurant info
+        restaurant_info = RestaurantInfo(
+            id=app.config['DEFAULT_RESTAURANT_ID'],
+            name="Gourmet Restaurant",
+            address="123 Main Street, City, Country",
+            phone="+1 234 567 8900",
+            email="info@gourmetrestaurant.com",
+            opening_hours="Monday to Sunday: 8:00 AM - 11:00 PM",
+            description="Welcome to Gourmet Restaurant, where we serve the finest dishes prepared by our expert chefs using fresh, locally sourced ingredients.",
+            quote="Exquisite dining experience"
+        )
+        
+        db.session.add(restaurant_info)
+        print("Created restaurant information.")
+        
+        # Sample users and dishes belong to this restaurant
+        g.restaurant_id = restaurant_info.id
+        
         # Create sample users
         users = [
             User(
@@ -62,6 +83,7 @@ def init_db():
         
         # Set passwords
         for user in users:
+            user.restaurant_id = restaurant_info.id
             user.set_password('password123')
         
         db.session.add_all(users)
@@ -201,23 +223,13 @@ def init_db():
             )
         ]
         
+        for dish in dishes:
+            dish.restaurant_id = restaurant_info.id
+            dish.sku = dish.name.lower().replace(' ', '-')
+        
         db.session.add_all(dishes)
         print("Created sample dishes.")
         
-        # Create restaurant info
-        restaurant_info = RestaurantInfo(
-            name="Gourmet Restaurant",
-            address="123 Main Street, City, Country",
-            phone="+1 234 567 8900",
-            email="info@gourmetrestaurant.com",
-            opening_hours="Monday to Sunday: 8:00 AM - 11:00 PM",
-            description="Welcome to Gourmet Restaurant, where we serve the finest dishes prepared by our expert chefs using fresh, locally sourced ingredients.",
-            quote="Exquisite dining experience"
-        )
-        
-        db.session.add(restaurant_info)
-        print("Created restaurant information.")
-        
         # Commit all changes
         db.session.commit()
         print("Database initialization complete!")
@@ -0,0 +1,95 @@
+# customer/batch.py
+from contextlib import nullcontext
+from flask import current_app
+from models import db, Order
+from tenancy import scoped
+from menu_io import compact_menu
+from ratelimit import consume_limits, concurrency_slot
+from customer.orders import place_order
+import idempotency
+
+
+class BatchError(ValueError):
+    pass
+
+
+# --- Operations: each takes the op's args dict and returns its result ---
+def op_cart_add(args):
+    # Cart lives in the browser for now, same as /api/cart/add
+    return {'success': True}
+
+def op_cart_update(args):
+    return {'success': True}
+
+def op_menu_get(args):
+    return compact_menu()
+
+def op_order_place(args):
+    # Same protections as /api/order/place: an optional idempotency_key in the
+    # args replays the earlier order, and each new order is charged to the
+    # place_order buckets
+    key = args.get('idempotency_key')
+    digest = None
+    if key:
+        if not isinstance(key, str) or len(key) > 100:
+            raise BatchError('Invalid idempotency_key')
+        digest = idempotency.request_hash({name: value for name, value in args.items()
+                                           if name != 'idempotency_key'})
+        body = idempotency.previous_response(key, digest)
+        if body is not None:
+            return body
+
+    consume_limits('place_order', {'table': args.get('table_number')})
+    with idempotency.using_key(key, digest):
+        order = place_order(args.get('table_number'), args.get('items', []))
+    return {'success': True, 'order_id': order.id}
+
+def op_order_status(args):
+    order_id = args.get('order_id')
+    if isinstance(order_id, bool) or not isinstance(order_id, int):
+        raise BatchError('order_id must be an integer')
+    order = scoped(Order).filter_by(id=order_id).first()
+    if not order:
+        raise BatchError('Order not found')
+    return {'success': True, 'order_id': order.id, 'status': order.status}
+
+OPERATIONS = {
+    'cart.add': op_cart_add,
+    'cart.update': op_cart_update,
+    'menu.get': op_menu_get,
+    'order.place': op_order_place,
+    'order.status': op_order_status,
+}
+
+
+def run_batch(ops):
+    """Run `ops` ([{'op': name, 'args': {...}}, ...]) in one transaction.
+    Either every op succeeds and the results are committed, or the whole
+    batch is rolled back and BatchError says which op failed. A batch that
+    places orders holds a place_order concurrency slot; RateLimited is raised
+    when none is free or an order's buckets are empty."""
+    if not isinstance(ops, list) or not ops:
+        raise BatchError('ops must be a non-empty list')
+    if len(ops) > current_app.config.get('BATCH_MAX_OPS', 50):
+        raise BatchError('Too many operations in one batch')
+
+    places_orders = any(isinstance(entry, dict) and entry.get('op') == 'order.place' for entry in ops)
+    results = []
+    try:
+        with concurrency_slot('place_order') if places_orders else nullcontext():
+            for index, entry in enumerate(ops):
+                handler = OPERATIONS.get(entry.get('op')) if isinstance(entry, dict) else None
+                if handler is None:
+                    raise BatchError(f'Unknown operation at index {index}')
+                args = entry.get('args') or {}
+                if not isinstance(args, dict):
+                    raise BatchError(f'Operation {index} ({entry["op"]}) failed: args must be an object')
+                try:
+                    results.append(handler(args))
+                except ValueError as e:
+                    raise BatchError(f'Operation {index} ({entry["op"]}) failed: {e}')
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return results
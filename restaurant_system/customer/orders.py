@@ -0,0 +1,59 @@
+# customer/orders.py
+from flask_login import current_user
+from models import db, Dish, Order, OrderItem
+from tenancy import scoped, current_restaurant_id
+import idempotency
+import recommendations
+import kitchen
+
+
+class OrderError(ValueError):
+    pass
+
+
+def place_order(table_number, items):
+    """Add a new order for the current customer to the session and flush it.
+    The caller commits, so several orders can share one transaction."""
+    if isinstance(table_number, bool) or not isinstance(table_number, int) or table_number < 1:
+        raise OrderError('Invalid table number')
+    if not items:
+        raise OrderError('Order has no items')
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise OrderError('Invalid items')
+    if not all(isinstance(item.get('dish_id'), int) for item in items):
+        raise OrderError('Invalid dish')
+    
+    order = Order(
+        restaurant_id=current_restaurant_id(),
+        table_number=table_number,
+        customer_id=current_user.id,
+        status='pending'
+    )
+    
+    # One query for all the dishes instead of one per line
+    dish_ids = {item.get('dish_id') for item in items}
+    dishes = {dish.id: dish for dish in scoped(Dish).filter(Dish.id.in_(dish_ids))}
+    
+    total_amount = 0
+    for item in items:
+        dish = dishes.get(item.get('dish_id'))
+        if not dish:
+            raise OrderError('Invalid dish')
+        quantity = item.get('quantity')
+        if not isinstance(quantity, int) or quantity < 1:
+            raise OrderError('Invalid quantity')
+        order_item = OrderItem(
+            dish_id=dish.id,
+            quantity=quantity,
+            price=dish.price
+        )
+        order.items.append(order_item)
+        total_amount += dish.price * quantity
+    
+    order.total_amount = total_amount
+    db.session.add(order)
+    idempotency.attach(order)
+    recommendations.record_order(order)
+    kitchen.create_tickets(order, dishes)
+    db.session.flush()
+    return order
@@ -0,0 +1,133 @@
+# customer/routes.py
+from flask import Blueprint, render_template, request, jsonify
+from flask_login import login_required
+from models import db, Dish
+from tenancy import scoped
+from sqlalchemy.exc import IntegrityError
+from ratelimit import rate_limit, concurrency_limit, too_many_requests, RateLimited
+from idempotency import idempotent
+from recommendations import recommended_dishes
+from menu_io import compact_menu
+from serialization import encode_response, decode_request
+from auth.routes import role_required
+from customer.orders import OrderError, place_order
+from customer.batch import BatchError, run_batch
+
+customer_bp = Blueprint('customer', __name__)
+
+# Customer routes
+@customer_bp.route('/customer/dashboard')
+@login_required
+@role_required('customer')
+def customer_dashboard():
+    return render_template('customer/dashboard.html')
+
+@customer_bp.route('/customer/menu')
+@login_required
+@role_required('customer')
+def customer_menu():
+    category = request.args.get('category', 'all')
+    search = request.args.get('search', '')
+    
+    query = scoped(Dish).filter_by(is_available=True)
+    
+    if category != 'all':
+        query = query.filter_by(category=category)
+    
+    if search:
+        query = query.filter(Dish.name.ilike(f'%{search}%') | Dish.description.ilike(f'%{search}%'))
+    
+    dishes = query.all()
+    return render_template('customer/menu.html', dishes=dishes, category=category, search=search)
+
+@customer_bp.route('/customer/dish/<int:dish_id>')
+@login_required
+@role_required('customer')
+def dish_detail(dish_id):
+    dish = scoped(Dish).filter_by(id=dish_id).first_or_404()
+    suggestions = recommended_dishes(dish)
+    
+    # Fall back to the manager's picks until there is enough order history
+    if not suggestions and dish.suggested_dishes:
+        suggestion_ids = [int(id) for id in dish.suggested_dishes.split(',')]
+        suggestions = scoped(Dish).filter(Dish.id.in_(suggestion_ids), Dish.is_available == True).all()
+    
+    return render_template('customer/dish_detail.html', dish=dish, suggestions=suggestions)
+
+@customer_bp.route('/customer/cart')
+@login_required
+@role_required('customer')
+def customer_cart():
+    return render_template('customer/cart.html')
+
+# API routes for customer
+@customer_bp.route('/api/cart/add', methods=['POST'])
+@login_required
+@role_required('customer')
+def api_add_to_cart():
+    data = request.get_json()
+    dish_id = data.get('dish_id')
+    quantity = data.get('quantity', 1)
+    
+    # In a real application, you would store cart in session or database
+    # This is a simplified version
+    return jsonify({'success': True})
+
+@customer_bp.route('/api/cart/update', methods=['POST'])
+@login_required
+@role_required('customer')
+def api_update_cart():
+    data = request.get_json()
+    # Update cart logic
+    return jsonify({'success': True})
+
+@customer_bp.route('/api/order/place', methods=['POST'])
+@login_required
+@role_required('customer')
+@idempotent
+@rate_limit('place_order')
+@concurrency_limit('place_order')
+def api_place_order():
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Request body must be an object'}), 400
+    
+    try:
+        order = place_order(data.get('table_number'), data.get('items', []))
+    except OrderError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    db.session.commit()
+    
+    return jsonify({'success': True, 'order_id': order.id})
+
+@customer_bp.route('/api/menu')
+@login_required
+@role_required('customer')
+def api_menu():
+    return encode_response(compact_menu())
+
+@customer_bp.route('/api/batch', methods=['POST'])
+@login_required
+@role_required('customer')
+@rate_limit('batch')
+@concurrency_limit('batch')
+def api_batch():
+    # One round trip (and one transaction) for a list of cart/menu/order operations
+    data = decode_request() or {}
+    if not isinstance(data, dict):
+        return encode_response({'success': False, 'error': 'Request body must be an object'}, status=400)
+    
+    try:
+        results = run_batch(data.get('ops'))
+    except BatchError as e:
+        return encode_response({'success': False, 'error': str(e)}, status=400)
+    except RateLimited as e:
+        return too_many_requests(e.retry_after)
+    except IntegrityError:
+        # A concurrent batch committed the same idempotency_key first; a retry replays it
+        return encode_response({'success': False,
+                                'error': 'An order with the same idempotency_key is being placed, please retry'},
+                               status=409)
+    
+    return encode_response({'success': True, 'results': results})
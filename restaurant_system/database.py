@@ -1,26 +1,19 @@
 # database.py
-from app import app, db
+from flask import g
+from app import create_app
+from models import db
 from models import User, Dish, RestaurantInfo
 
 def init_db():
+    app = create_app()
     with app.app_context():
         db.create_all()
-        
-        # Create default admin user if not exists
-        if not User.query.filter_by(username='admin').first():
-            admin = User(username='admin', email='admin@restaurant.com', role='manager')
-            admin.set_password('admin123')
-            db.session.add(admin)
-        
-        # Create default staff user if not exists
-        if not User.query.filter_by(username='staff').first():
-            staff = User(username='staff', email='staff@restaurant.com', role='staff')
-            staff.set_password('staff123')
-            db.session.add(staff)
+        restaurant_id = app.config['DEFAULT_RESTAURANT_ID']
         
         # Create default restaurant info if not exists
-        if not RestaurantInfo.query.first():
+        if not db.session.get(RestaurantInfo, restaurant_id):
             restaurant = RestaurantInfo(
+                id=restaurant_id,
                 name="Gourmet Restaurant",
                 address="123 Main Street, City, Country",
                 phone="+1 234 567 8900",
@@ -31,6 +24,21 @@ def init_db():
             )
             db.session.add(restaurant)
         
+        # Default users belong to the default restaurant
+        g.restaurant_id = restaurant_id
+        
+        # Create default admin user if not exists
+        if not User.query.filter_by(restaurant_id=restaurant_id, username='admin').first():
+            admin = User(restaurant_id=restaurant_id, username='admin', email='admin@restaurant.com', role='manager')
+            admin.set_password('admin123')
+            db.session.add(admin)
+        
+        # Create default staff user if not exists
+        if not User.query.filter_by(restaurant_id=restaurant_id, username='staff').first():
+            staff = User(restaurant_id=restaurant_id, username='staff', email='staff@restaurant.com', role='staff')
+            staff.set_password('staff123')
+            db.session.add(staff)
+        
         db.session.commit()
 
 if __name__ == '__main__':
@@ -0,0 +1,186 @@
+# idempotency.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, request, jsonify, g
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+
+from models import db, IdempotencyKey
+
+
+class IdempotencyConflict(ValueError):
+    pass
+
+
+class ResponseCache:
+    """Small LRU of finished responses with a time-to-live, so a retry is
+    answered without touching the database."""
+
+    def __init__(self, max_size=10000, ttl=24 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items = OrderedDict()  # scope -> (stored at, (request hash, response body))
+        self._lock = threading.Lock()
+
+    def get(self, scope):
+        with self._lock:
+            item = self._items.get(scope)
+            if item is None:
+                return None
+            if time.monotonic() - item[0] > self.ttl:
+                del self._items[scope]
+                return None
+            self._items.move_to_end(scope)
+            return item[1]
+
+    def put(self, scope, body):
+        with self._lock:
+            self._items[scope] = (time.monotonic(), body)
+            self._items.move_to_end(scope)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+_locks = {}  # scope -> [lock, number of requests using it]
+_locks_lock = threading.Lock()
+
+@contextmanager
+def key_lock(scope):
+    # Duplicates arriving at the same time wait here for the first one to finish
+    with _locks_lock:
+        entry = _locks.setdefault(scope, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _locks_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _locks[scope]
+
+
+def get_cache():
+    app = current_app._get_current_object()
+    cache = app.extensions.get('idempotency')
+    if cache is None:
+        cache = ResponseCache(app.config.get('IDEMPOTENCY_CACHE_SIZE', 10000),
+                              app.config.get('IDEMPOTENCY_TTL', 24 * 3600))
+        app.extensions['idempotency'] = cache
+    return cache
+
+
+CONFLICT_MESSAGE = 'Idempotency-Key was already used with a different request'
+
+def request_hash(data=None):
+    """sha256 of the raw request body (or of `data` as canonical JSON), stored
+    with the key so a reused key with a different body is refused instead of replayed."""
+    if data is None:
+        raw = request.get_data()
+    else:
+        raw = json.dumps(data, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _stored_response(scope):
+    # (request hash, response body) of the committed order for `scope`, or None
+    restaurant_id, customer_id, key = scope
+    row = IdempotencyKey.query.filter_by(restaurant_id=restaurant_id, customer_id=customer_id,
+                                         key=key).first()
+    if row is None:
+        return None
+    return row.request_hash, {'success': True, 'order_id': row.order_id}
+
+
+def _matches(stored, digest):
+    # Keys recorded before hashes were stored have none; replay those as before
+    return stored[0] is None or stored[0] == digest
+
+
+def _replay(stored, digest):
+    if not _matches(stored, digest):
+        return jsonify({'success': False, 'error': CONFLICT_MESSAGE}), 422
+    return jsonify(stored[1])
+
+
+def previous_response(key, digest):
+    """Body of the order the current user already placed with `key`, or None
+    for a new key; raises IdempotencyConflict if it came with another request.
+    For callers that place orders outside the `idempotent` decorator (/api/batch)."""
+    scope = (g.restaurant_id, current_user.id, key)
+    # Only committed responses are cached, so a lookup here never caches a
+    # row the surrounding transaction may still roll back
+    stored = get_cache().get(scope) or _stored_response(scope)
+    if stored is None:
+        return None
+    if not _matches(stored, digest):
+        raise IdempotencyConflict(CONFLICT_MESSAGE)
+    return stored[1]
+
+
+@contextmanager
+def using_key(key, digest):
+    """Have attach() record `key` for orders placed inside the block."""
+    g.idempotency_key, g.idempotency_hash = key, digest
+    try:
+        yield
+    finally:
+        g.pop('idempotency_key', None)
+        g.pop('idempotency_hash', None)
+
+
+def attach(order):
+    """Record the request's Idempotency-Key against `order` in the same
+    transaction that creates it; a no-op when the client sent no key."""
+    key = g.get('idempotency_key')
+    if key:
+        db.session.add(IdempotencyKey(restaurant_id=order.restaurant_id,
+                                      customer_id=order.customer_id, key=key,
+                                      request_hash=g.get('idempotency_hash'), order=order))
+
+
+def idempotent(f):
+    """Replay the original response when a request repeats its Idempotency-Key
+    with the same body; a different body under a used key gets a 422."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > 100:
+            return jsonify({'success': False, 'error': 'Idempotency-Key is too long'}), 400
+
+        cache = get_cache()
+        scope = (g.restaurant_id, current_user.id, key)
+        digest = request_hash()
+        stored = cache.get(scope)
+        if stored is not None:
+            return _replay(stored, digest)
+
+        with key_lock(scope):
+            stored = cache.get(scope) or _stored_response(scope)
+            if stored is None:
+                g.idempotency_key = key
+                g.idempotency_hash = digest
+                try:
+                    response = current_app.make_response(f(*args, **kwargs))
+                except IntegrityError:
+                    # Another worker committed the same key first; answer with its order
+                    db.session.rollback()
+                    stored = _stored_response(scope)
+                    if stored is None:
+                        raise
+                else:
+                    data = response.get_json(silent=True)
+                    if response.status_code == 200 and data and data.get('success'):
+                        cache.put(scope, (digest, data))
+                    return response
+            cache.put(scope, stored)
+        return _replay(stored, digest)
+    return decorated_function
@@ -0,0 +1,230 @@
+# kitchen.py
+import heapq
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app, g
+
+from models import db, KitchenTicket
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def station_for(category):
+    """Kitchen station that prepares dishes of `category`."""
+    stations = current_app.config['KITCHEN_STATIONS']
+    for name, station in stations.items():
+        if category in station['categories']:
+            return name
+    return current_app.config['KITCHEN_DEFAULT_STATION']
+
+
+def create_tickets(order, dishes):
+    """Split `order` into one ticket per station. `dishes` maps dish id to Dish
+    for the order's lines. Call before committing the order."""
+    stations = current_app.config['KITCHEN_STATIONS']
+    lines = {}
+    for item in order.items:
+        dish = dishes[item.dish_id]
+        lines.setdefault(station_for(dish.category), []).append([dish.name, item.quantity])
+
+    now = utcnow()
+    for station, items in lines.items():
+        prep = timedelta(minutes=stations[station]['prep_minutes'])
+        db.session.add(KitchenTicket(restaurant_id=order.restaurant_id, order=order,
+                                     table_number=order.table_number, station=station,
+                                     items=json.dumps(items), created_at=now,
+                                     promised_at=now + prep))
+
+
+class StationQueue:
+    """Tickets for one station, ordered by promised time on a heap. Removal is
+    lazy: a finished ticket leaves the dict now and the heap when it reaches
+    the top, so push and remove are both O(log n)."""
+
+    def __init__(self):
+        self._heap = []  # (promised_at, ticket id)
+        self._tickets = {}  # ticket id -> ticket dict
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def ids(self):
+        return self._tickets.keys()
+
+    def push(self, ticket):
+        self._tickets[ticket['id']] = ticket
+        heapq.heappush(self._heap, (ticket['promised_at'], ticket['id']))
+
+    def remove(self, ticket_id):
+        ticket = self._tickets.pop(ticket_id, None)
+        while self._heap and self._heap[0][1] not in self._tickets:
+            heapq.heappop(self._heap)
+        # Keep stale entries from piling up behind the top
+        if len(self._heap) > 2 * len(self._tickets) + 64:
+            self._heap = [entry for entry in self._heap if entry[1] in self._tickets]
+            heapq.heapify(self._heap)
+        return ticket
+
+    def first(self):
+        return self._tickets[self._heap[0][1]] if self._tickets else None
+
+    def upcoming(self, limit):
+        entries = heapq.nsmallest(limit + len(self._heap) - len(self._tickets), self._heap)
+        return [self._tickets[ticket_id] for _, ticket_id in entries if ticket_id in self._tickets][:limit]
+
+
+class KitchenScheduler:
+    """Per-station ticket queues for every restaurant served by this worker.
+
+    The database is the source of truth. Each view loads tickets created
+    since its last sync by ticket id (an index range, usually empty), so a
+    poll costs O(new tickets) plus the heap work. Tickets finished here
+    leave the queues at once. Every reconcile_seconds the queues are
+    also compared with the status='queued' rows, which costs O(queue), to
+    catch tickets finished by other workers and tickets committed out of
+    id order.
+    """
+
+    def __init__(self, recent_waits=200, reconcile_seconds=5):
+        self._lock = threading.Lock()
+        self._queues = {}  # (restaurant_id, station) -> StationQueue
+        self._last_ticket_id = {}  # restaurant_id -> highest ticket id seen
+        self._reconciled = {}  # restaurant_id -> monotonic time of the last reconcile
+        self._reconcile_seconds = reconcile_seconds
+        self._waits = {}  # (restaurant_id, station) -> recent waits in seconds
+        self._recent_waits = recent_waits
+
+    def _queue(self, restaurant_id, station):
+        return self._queues.setdefault((restaurant_id, station), StationQueue())
+
+    @staticmethod
+    def _as_dict(ticket):
+        return {'id': ticket.id, 'order_id': ticket.order_id, 'table_number': ticket.table_number,
+                'station': ticket.station, 'items': json.loads(ticket.items),
+                'created_at': ticket.created_at, 'promised_at': ticket.promised_at}
+
+    def _finish(self, restaurant_id, station, ticket_id, completed_at):
+        ticket = self._queue(restaurant_id, station).remove(ticket_id)
+        if ticket is not None and completed_at is not None:
+            waits = self._waits.setdefault((restaurant_id, station), deque(maxlen=self._recent_waits))
+            # Timestamps come from different workers' clocks; skew must not go negative
+            waits.append(max(0.0, (completed_at - ticket['created_at']).total_seconds()))
+
+    def sync(self, restaurant_id):
+        with self._lock:
+            last_id = self._last_ticket_id.get(restaurant_id)
+            query = KitchenTicket.query.filter(KitchenTicket.restaurant_id == restaurant_id)
+            if last_id is None:
+                # First load: only what is still waiting, not the whole history.
+                # Take the high-water mark first and load up to it, so a ticket
+                # inserted in between is picked up by the next sync
+                last_id = db.session.query(db.func.max(KitchenTicket.id)).filter(
+                    KitchenTicket.restaurant_id == restaurant_id).scalar() or 0
+                new_tickets = (query.filter(KitchenTicket.status == 'queued', KitchenTicket.id <= last_id)
+                               .order_by(KitchenTicket.id).all())
+                self._reconciled[restaurant_id] = time.monotonic()
+            else:
+                new_tickets = query.filter(KitchenTicket.id > last_id).order_by(KitchenTicket.id).all()
+            for ticket in new_tickets:
+                last_id = max(last_id, ticket.id)
+                if ticket.status == 'queued':
+                    self._queue(restaurant_id, ticket.station).push(self._as_dict(ticket))
+            self._last_ticket_id[restaurant_id] = last_id
+
+            if time.monotonic() - self._reconciled[restaurant_id] >= self._reconcile_seconds:
+                self._reconcile(restaurant_id, query, last_id)
+
+    def _reconcile(self, restaurant_id, query, last_id):
+        # Compare what is held here with the queued rows: tickets that are no
+        # longer queued were finished by another worker, closed with their
+        # order or archived; queued ones not held committed after a sync had
+        # already passed their id (ids need not follow commit order)
+        held = {ticket_id: station for (rid, station), queue in self._queues.items()
+                if rid == restaurant_id for ticket_id in queue.ids()}
+        queued = {ticket_id for ticket_id, in query.filter(KitchenTicket.status == 'queued',
+                                                           KitchenTicket.id <= last_id)
+                  .with_entities(KitchenTicket.id)}
+        late = queued.difference(held)
+        if late:
+            for ticket in query.filter(KitchenTicket.id.in_(late)):
+                self._queue(restaurant_id, ticket.station).push(self._as_dict(ticket))
+        gone = [ticket_id for ticket_id in held if ticket_id not in queued]
+        if gone:
+            completed = dict(query.filter(KitchenTicket.id.in_(gone))
+                             .with_entities(KitchenTicket.id, KitchenTicket.completed_at))
+            for ticket_id in gone:
+                self._finish(restaurant_id, held[ticket_id], ticket_id, completed.get(ticket_id))
+        self._reconciled[restaurant_id] = time.monotonic()
+
+    def finished(self, restaurant_id, tickets):
+        """Drop tickets this worker just committed as done, given as
+        (id, station, completed_at), without waiting for the next reconcile."""
+        with self._lock:
+            for ticket_id, station, completed_at in tickets:
+                self._finish(restaurant_id, station, ticket_id, completed_at)
+
+    def station_view(self, restaurant_id, station, limit=50):
+        self.sync(restaurant_id)
+        with self._lock:
+            return self._queue(restaurant_id, station).upcoming(limit)
+
+    def metrics(self, restaurant_id):
+        self.sync(restaurant_id)
+        now = utcnow()
+        result = {}
+        with self._lock:
+            for station in current_app.config['KITCHEN_STATIONS']:
+                queue = self._queue(restaurant_id, station)
+                first = queue.first()
+                waits = self._waits.get((restaurant_id, station)) or ()
+                result[station] = {
+                    'depth': len(queue),
+                    'oldest_wait_seconds': (now - first['created_at']).total_seconds() if first else 0,
+                    'next_due_in_seconds': (first['promised_at'] - now).total_seconds() if first else None,
+                    'avg_wait_seconds': sum(waits) / len(waits) if waits else None,
+                }
+        return result
+
+
+def get_scheduler():
+    app = current_app._get_current_object()
+    scheduler = app.extensions.get('kitchen')
+    if scheduler is None:
+        scheduler = app.extensions.setdefault(
+            'kitchen', KitchenScheduler(reconcile_seconds=app.config.get('KITCHEN_RECONCILE_SECONDS', 5)))
+    return scheduler
+
+
+def close_order_tickets(order):
+    """Mark the order's remaining tickets done once it is delivered or paid.
+    The caller commits, then passes the returned (id, station, completed_at)
+    list to get_scheduler().finished()."""
+    if order.status not in ('delivered', 'paid'):
+        return []
+    now = utcnow()
+    tickets = KitchenTicket.query.filter_by(restaurant_id=order.restaurant_id, order_id=order.id,
+                                            status='queued').all()
+    for ticket in tickets:
+        ticket.status = 'done'
+        ticket.completed_at = now
+    return [(ticket.id, ticket.station, now) for ticket in tickets]
+
+
+def complete_ticket(ticket_id):
+    """Mark a ticket of the current restaurant done; returns it, or None if unknown."""
+    ticket = KitchenTicket.query.filter_by(restaurant_id=g.restaurant_id, id=ticket_id).first()
+    if ticket is None:
+        return None
+    if ticket.status != 'done':
+        ticket.status = 'done'
+        ticket.completed_at = utcnow()
+        finished = [(ticket.id, ticket.station, ticket.completed_at)]
+        db.session.commit()
+        get_scheduler().finished(g.restaurant_id, finished)
+    return ticket
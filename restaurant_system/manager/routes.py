@@ -0,0 +1,178 @@
+# manager/routes.py
+from flask import (Blueprint, Response, render_template, request, redirect, url_for, flash, abort,
+                   jsonify, stream_with_context)
+from flask_login import login_required
+from models import db, Dish, Order, RestaurantInfo
+from tenancy import scoped, current_restaurant_id
+from archive import paid_order_history, find_order
+from menu_io import MenuImportError, import_menu, export_menu, menu_updated
+from auth.routes import role_required
+
+manager_bp = Blueprint('manager', __name__)
+
+# Manager routes
+@manager_bp.route('/manager/dashboard')
+@login_required
+@role_required('manager')
+def manager_dashboard():
+    return render_template('manager/dashboard.html')
+
+@manager_bp.route('/manager/dishes')
+@login_required
+@role_required('manager')
+def manager_dishes():
+    dishes = scoped(Dish).all()
+    return render_template('manager/manage_dishes.html', dishes=dishes)
+
+@manager_bp.route('/manager/dishes/add', methods=['GET', 'POST'])
+@login_required
+@role_required('manager')
+def add_dish():
+    if request.method == 'POST':
+        name = request.form.get('name')
+        price = request.form.get('price')
+        description = request.form.get('description')
+        category = request.form.get('category')
+        image_url = request.form.get('image_url')
+        ar_model_url = request.form.get('ar_model_url')
+        suggested_dishes = request.form.get('suggested_dishes')
+        sku = request.form.get('sku') or None
+        
+        dish = Dish(
+            restaurant_id=current_restaurant_id(),
+            sku=sku,
+            name=name,
+            price=price,
+            description=description,
+            category=category,
+            image_url=image_url,
+            ar_model_url=ar_model_url,
+            suggested_dishes=suggested_dishes
+        )
+        
+        db.session.add(dish)
+        db.session.commit()
+        menu_updated.send(None, restaurant_id=current_restaurant_id())
+        
+        flash('Dish added successfully', 'success')
+        return redirect(url_for('manager.manager_dishes'))
+    
+    return render_template('manager/add_dish.html')
+
+@manager_bp.route('/manager/dishes/<int:dish_id>/edit', methods=['GET', 'POST'])
+@login_required
+@role_required('manager')
+def edit_dish(dish_id):
+    dish = scoped(Dish).filter_by(id=dish_id).first_or_404()
+    
+    if request.method == 'POST':
+        dish.name = request.form.get('name')
+        dish.price = request.form.get('price')
+        dish.description = request.form.get('description')
+        dish.category = request.form.get('category')
+        dish.image_url = request.form.get('image_url')
+        dish.ar_model_url = request.form.get('ar_model_url')
+        dish.suggested_dishes = request.form.get('suggested_dishes')
+        dish.is_available = request.form.get('is_available') == 'on'
+        if 'sku' in request.form:
+            dish.sku = request.form.get('sku') or None
+        
+        db.session.commit()
+        menu_updated.send(None, restaurant_id=current_restaurant_id())
+        
+        flash('Dish updated successfully', 'success')
+        return redirect(url_for('manager.manager_dishes'))
+    
+    return render_template('manager/edit_dish.html', dish=dish)
+
+@manager_bp.route('/manager/menu/import', methods=['POST'])
+@login_required
+@role_required('manager')
+def import_menu_file():
+    upload = request.files.get('menu_file')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'error': 'No file uploaded'}), 400
+    fmt = upload.filename.rsplit('.', 1)[-1].lower()
+    if fmt not in ('csv', 'json', 'jsonl'):
+        return jsonify({'success': False, 'error': 'Upload a .csv, .json or .jsonl file'}), 400
+    dry_run = request.form.get('dry_run') in ('1', 'true', 'on')
+    
+    try:
+        diff = import_menu(upload.stream, fmt, dry_run=dry_run)
+    except MenuImportError as e:
+        return jsonify({'success': False, 'error': 'Invalid rows', 'errors': e.errors}), 422
+    except ValueError as e:
+        # Malformed JSON or text that isn't UTF-8
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return jsonify({'success': True, 'dry_run': dry_run, 'diff': diff})
+
+@manager_bp.route('/manager/menu/export')
+@login_required
+@role_required('manager')
+def export_menu_file():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'jsonl'):
+        abort(400)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(export_menu(fmt)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=menu.{fmt}'})
+
+@manager_bp.route('/manager/orders')
+@login_required
+@role_required('manager')
+def manager_orders():
+    orders = scoped(Order).all()
+    return render_template('manager/orders.html', orders=orders)
+
+@manager_bp.route('/manager/history')
+@login_required
+@role_required('manager')
+def manager_history():
+    page = max(request.args.get('page', 1, type=int), 1)
+    orders = paid_order_history(page)
+    return render_template('manager/history.html', orders=orders, page=page)
+
+@manager_bp.route('/manager/settings', methods=['GET', 'POST'])
+@login_required
+@role_required('manager')
+def manager_settings():
+    restaurant_info = db.session.get(RestaurantInfo, current_restaurant_id())
+    if not restaurant_info:
+        restaurant_info = RestaurantInfo(
+            id=current_restaurant_id(),
+            name="Restaurant Name",
+            address="Restaurant Address",
+            phone="+1234567890",
+            email="info@restaurant.com",
+            opening_hours="9:00 AM - 10:00 PM",
+            description="About our restaurant",
+            quote="Our restaurant quote"
+        )
+        db.session.add(restaurant_info)
+        db.session.commit()
+    
+    if request.method == 'POST':
+        restaurant_info.name = request.form.get('name')
+        restaurant_info.address = request.form.get('address')
+        restaurant_info.phone = request.form.get('phone')
+        restaurant_info.email = request.form.get('email')
+        restaurant_info.opening_hours = request.form.get('opening_hours')
+        restaurant_info.description = request.form.get('description')
+        restaurant_info.quote = request.form.get('quote')
+        
+        db.session.commit()
+        flash('Restaurant information updated successfully', 'success')
+    
+    return render_template('manager/settings.html', restaurant=restaurant_info)
+
+@manager_bp.route('/api/order/<int:order_id>/bill')
+@login_required
+@role_required('manager')
+def generate_bill(order_id):
+    order = find_order(order_id)
+    if not order:
+        abort(404)
+    restaurant = db.session.get(RestaurantInfo, current_restaurant_id())
+    
+    return render_template('manager/bill.html', order=order, restaurant=restaurant)
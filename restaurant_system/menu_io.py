@@ -0,0 +1,216 @@
+# menu_io.py
+import csv
+import io
+import json
+import math
+import threading
+import time
+
+from flask import g, current_app
+from flask.signals import Namespace
+
+from models import db, Dish
+from tenancy import scoped
+
+# Sent once per change to a restaurant's menu (a form edit or a whole import),
+# with restaurant_id=...; anything caching menu data subscribes to it
+menu_updated = Namespace().signal('menu-updated')
+
+# Column order of the compact menu payload served by /api/menu and /api/batch
+COMPACT_MENU_FIELDS = ('id', 'name', 'price', 'category', 'description', 'image_url', 'ar_model_url')
+
+MENU_FIELDS = ('sku', 'name', 'price', 'description', 'category', 'image_url', 'ar_model_url',
+               'is_available', 'suggested_dishes')
+# Columns a new dish can't be created without (besides sku)
+REQUIRED_FIELDS = ('name', 'category', 'price')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'n', 'off')
+
+
+class MenuImportError(Exception):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, raw dict) from a CSV, JSON Lines or JSON array upload,
+    reading CSV and JSON Lines a line at a time."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_num, line in enumerate(text, start=1):
+            if line.strip():
+                yield line_num, json.loads(line)
+    elif fmt == 'json':
+        for index, row in enumerate(json.load(text), start=1):
+            yield index, row
+    else:
+        raise ValueError(f"Unsupported menu format: {fmt}")
+
+
+def clean_row(raw):
+    """Validate one raw row; returns (values, error message or None). values
+    only has the columns present in the row, so an update leaves the others alone."""
+    if not isinstance(raw, dict):
+        return None, "row is not an object"
+    row = {key: (value.strip() if isinstance(value, str) else value) for key, value in raw.items()
+           if key in MENU_FIELDS}
+
+    sku = str(row.get('sku') or '').strip()
+    if not sku:
+        return None, "sku is required"
+    values = {'sku': sku}
+
+    for field in ('name', 'category'):
+        if field in row:
+            if not row[field]:
+                return None, f"{field} is required"
+            values[field] = str(row[field])
+    if 'price' in row:
+        if isinstance(row['price'], bool):
+            return None, "price must be a number"
+        try:
+            price = round(float(row['price']), 2)
+        except (TypeError, ValueError):
+            return None, "price must be a number"
+        if not math.isfinite(price):
+            return None, "price must be a number"
+        if price < 0:
+            return None, "price must not be negative"
+        values['price'] = price
+    # A blank cell leaves an existing dish as it is (new dishes start available)
+    if row.get('is_available') not in ('', None):
+        available = row['is_available']
+        if isinstance(available, str):
+            if available.lower() in TRUE_VALUES:
+                available = True
+            elif available.lower() in FALSE_VALUES:
+                available = False
+            else:
+                return None, "is_available must be true or false"
+        values['is_available'] = bool(available)
+    for field in ('description', 'image_url', 'ar_model_url', 'suggested_dishes'):
+        if field in row:
+            values[field] = str(row[field]) if row[field] else None
+
+    return values, None
+
+
+def _same(old, new):
+    # Forms store blank text as '' while imports use None; don't report that as a change
+    return old == new or (old in ('', None) and new in ('', None))
+
+
+def import_menu(stream, fmt, dry_run=False, batch_size=500):
+    """Upsert dishes for the current restaurant keyed by SKU.
+
+    Every row is validated first; if any are invalid nothing is written and
+    MenuImportError carries the errors. Returns a diff of what was (or, with
+    dry_run, would be) added and changed.
+    """
+    existing = {dish.sku: dish for dish in scoped(Dish).filter(Dish.sku.isnot(None))}
+    inserts, updates, errors = [], [], []
+    diff = {'added': [], 'changed': [], 'unchanged': 0}
+    seen = set()
+
+    for line_num, raw in read_rows(stream, fmt):
+        values, error = clean_row(raw)
+        if error is None and values['sku'] in seen:
+            error = "duplicate sku in file"
+        if error:
+            errors.append({'line': line_num, 'error': error})
+            continue
+        seen.add(values['sku'])
+
+        dish = existing.get(values['sku'])
+        if dish is None:
+            missing = [field for field in REQUIRED_FIELDS if field not in values]
+            if missing:
+                errors.append({'line': line_num, 'error': f"{missing[0]} is required"})
+                continue
+            # Every insert carries all columns so they can share one executemany
+            row = dict({field: None for field in MENU_FIELDS}, is_available=True)
+            row.update(values)
+            inserts.append(dict(row, restaurant_id=g.restaurant_id))
+            diff['added'].append(values['sku'])
+            continue
+        changes = {field: [getattr(dish, field), value] for field, value in values.items()
+                   if not _same(getattr(dish, field), value)}
+        if changes:
+            updates.append(dict(values, id=dish.id))
+            diff['changed'].append({'sku': values['sku'], 'fields': changes})
+        else:
+            diff['unchanged'] += 1
+
+    if errors:
+        raise MenuImportError(errors)
+    if dry_run:
+        return diff
+
+    # executemany in batches; updates go through the primary key
+    for start in range(0, len(inserts), batch_size):
+        db.session.execute(db.insert(Dish), inserts[start:start + batch_size])
+    for start in range(0, len(updates), batch_size):
+        db.session.execute(db.update(Dish), updates[start:start + batch_size])
+    db.session.commit()
+
+    if inserts or updates:
+        menu_updated.send(None, restaurant_id=g.restaurant_id)
+    return diff
+
+
+def export_menu(fmt):
+    """Yield the current restaurant's menu as CSV or JSON Lines, chunk by chunk."""
+    dishes = scoped(Dish).order_by(Dish.id).yield_per(500)
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=MENU_FIELDS)
+        writer.writeheader()
+        for dish in dishes:
+            writer.writerow({field: getattr(dish, field) for field in MENU_FIELDS})
+            if buffer.tell() > 8192:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    elif fmt == 'jsonl':
+        for dish in dishes:
+            yield json.dumps({field: getattr(dish, field) for field in MENU_FIELDS}) + '\n'
+    else:
+        raise ValueError(f"Unsupported menu format: {fmt}")
+
+
+_menu_cache_lock = threading.Lock()
+
+def _menu_cache():
+    # restaurant_id -> (built at, payload), kept per app
+    return current_app.extensions.setdefault('menu_cache', {})
+
+@menu_updated.connect
+def _drop_cached_menu(sender, restaurant_id=None, **extra):
+    with _menu_cache_lock:
+        _menu_cache().pop(restaurant_id, None)
+
+
+def compact_menu():
+    """Available dishes of the current restaurant as {'fields': [...], 'rows': [[...], ...]},
+    which drops the repeated keys of a list of objects. Cached per restaurant
+    until the menu changes; MENU_CACHE_TTL bounds staleness across workers."""
+    restaurant_id = g.restaurant_id
+    ttl = current_app.config.get('MENU_CACHE_TTL', 30)
+    cached = _menu_cache().get(restaurant_id)
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    columns = [getattr(Dish, field) for field in COMPACT_MENU_FIELDS]
+    rows = (scoped(Dish).filter_by(is_available=True).order_by(Dish.category, Dish.id)
+            .with_entities(*columns).all())
+    payload = {'fields': list(COMPACT_MENU_FIELDS), 'rows': [list(row) for row in rows]}
+    with _menu_cache_lock:
+        _menu_cache()[restaurant_id] = (time.monotonic(), payload)
+    return payload
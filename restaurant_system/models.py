@@ -2,13 +2,21 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from tenancy import TenantSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': TenantSession})
 
 class User(UserMixin, db.Model):
+    # Usernames and emails are unique per restaurant, not across the chain
+    __table_args__ = (
+        db.UniqueConstraint('restaurant_id', 'username', name='uq_user_restaurant_username'),
+        db.UniqueConstraint('restaurant_id', 'email', name='uq_user_restaurant_email'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'), nullable=False)
+    username = db.Column(db.String(80), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
     password_hash = db.Column(db.String(128))
     role = db.Column(db.String(20), nullable=False)  # customer, staff, manager
     table_number = db.Column(db.Integer, nullable=True)  # Only for customers
@@ -18,9 +26,22 @@ class User(UserMixin, db.Model):
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
+    
+    def get_id(self):
+        # User ids restart at 1 in each restaurant's database, so the session
+        # remembers which restaurant the id belongs to
+        return f'{self.restaurant_id}:{self.id}'
 
 class Dish(db.Model):
+    __table_args__ = (
+        db.Index('ix_dish_restaurant_category', 'restaurant_id', 'category'),
+        db.Index('ix_dish_restaurant_available', 'restaurant_id', 'is_available'),
+        db.UniqueConstraint('restaurant_id', 'sku', name='uq_dish_restaurant_sku'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'), nullable=False)
+    sku = db.Column(db.String(64))  # Stable key for menu import/export
     name = db.Column(db.String(100), nullable=False)
     price = db.Column(db.Float, nullable=False)
     description = db.Column(db.Text)
@@ -31,21 +52,109 @@ class Dish(db.Model):
     suggested_dishes = db.Column(db.String(200))  # Comma separated dish IDs
 
 class Order(db.Model):
+    # AUTOINCREMENT: SQLite would otherwise hand the ids of archived (deleted)
+    # orders out again, and they live on in the archive
+    __table_args__ = (
+        db.Index('ix_order_restaurant_status', 'restaurant_id', 'status'),
+        db.Index('ix_order_restaurant_created', 'restaurant_id', 'created_at'),
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'), nullable=False)
     table_number = db.Column(db.Integer, nullable=False)
     customer_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     status = db.Column(db.String(20), default='pending')  # pending, preparing, delivered, paid
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     total_amount = db.Column(db.Float, default=0.0)
+    items = db.relationship('OrderItem', backref='order', lazy=True)
 
 class OrderItem(db.Model):
+    __table_args__ = (
+        db.Index('ix_order_item_order_dish', 'order_id', 'dish_id'),
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'))
     dish_id = db.Column(db.Integer, db.ForeignKey('dish.id'))
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Float, nullable=False)
 
+class ArchivedOrder(db.Model):
+    # Paid orders moved out of the live table by archive.py; same ids as before.
+    # Ids restart in each restaurant's own database, so the key includes restaurant_id
+    __table_args__ = (
+        db.Index('ix_archived_order_restaurant_created', 'restaurant_id', 'created_at'),
+    )
+
+    restaurant_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    table_number = db.Column(db.Integer, nullable=False)
+    customer_id = db.Column(db.Integer)
+    status = db.Column(db.String(20), default='paid')
+    created_at = db.Column(db.DateTime)
+    total_amount = db.Column(db.Float, default=0.0)
+    archived_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    items = db.relationship('ArchivedOrderItem', backref='order', lazy=True)
+
+class ArchivedOrderItem(db.Model):
+    __table_args__ = (
+        db.ForeignKeyConstraint(['restaurant_id', 'order_id'],
+                                ['archived_order.restaurant_id', 'archived_order.id']),
+        db.Index('ix_archived_order_item_order_dish', 'restaurant_id', 'order_id', 'dish_id'),
+    )
+
+    restaurant_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, nullable=False)
+    dish_id = db.Column(db.Integer)
+    quantity = db.Column(db.Integer, nullable=False)
+    price = db.Column(db.Float, nullable=False)
+
+class DishPair(db.Model):
+    # Sparse co-occurrence matrix kept by recommendations.py: number of orders
+    # containing both dishes; dish_id == other_dish_id holds the dish's own count
+    restaurant_id = db.Column(db.Integer, primary_key=True)
+    dish_id = db.Column(db.Integer, primary_key=True)
+    other_dish_id = db.Column(db.Integer, primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+
+class KitchenTicket(db.Model):
+    # The part of an order one kitchen station prepares (see kitchen.py)
+    __table_args__ = (
+        db.Index('ix_kitchen_ticket_restaurant_status', 'restaurant_id', 'status', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, index=True)
+    table_number = db.Column(db.Integer, nullable=False)
+    station = db.Column(db.String(50), nullable=False)
+    items = db.Column(db.Text, nullable=False)  # JSON list of [dish name, quantity]
+    status = db.Column(db.String(20), default='queued')  # queued, done
+    created_at = db.Column(db.DateTime, nullable=False)
+    promised_at = db.Column(db.DateTime, nullable=False)
+    completed_at = db.Column(db.DateTime)
+    order = db.relationship('Order')
+
+class IdempotencyKey(db.Model):
+    # Client-supplied key for a placed order, so a retried request returns the same order
+    __table_args__ = (
+        db.UniqueConstraint('restaurant_id', 'customer_id', 'key', name='uq_idempotency_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant_info.id'), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    key = db.Column(db.String(100), nullable=False)
+    request_hash = db.Column(db.String(64))  # sha256 of the request body that used the key
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    order = db.relationship('Order')
+
 class RestaurantInfo(db.Model):
+    # Each row is one restaurant (tenant); its id is the restaurant_id used everywhere else
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     address = db.Column(db.Text, nullable=False)
@@ -53,4 +162,4 @@ class RestaurantInfo(db.Model):
     email = db.Column(db.String(100))
     opening_hours = db.Column(db.Text)
     description = db.Column(db.Text)
-    quote = db.Column(db.String(200))
\ No newline at end of file
+    quote = db.Column(db.String(200))
@@ -0,0 +1,182 @@
+# ratelimit.py
+import heapq
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, request, jsonify, g
+from flask_login import current_user
+from werkzeug.utils import import_string
+
+
+class MemoryBackend:
+    """In-process token buckets. Each worker keeps its own counts, which is
+    enough to stop one client from hogging that worker."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> (tokens, last refill time)
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, capacity, cost=1):
+        """Take `cost` tokens from the bucket for `key`, refilled at `rate`
+        tokens per second up to `capacity`. Returns (allowed, retry_after)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (cost - tokens) / rate
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now):
+        # Drop buckets idle long enough to have refilled; they'd start full anyway
+        for key, (tokens, last) in list(self._buckets.items()):
+            if now - last > 3600:
+                del self._buckets[key]
+        # Still too many (e.g. a flood of spoofed keys): forget the stalest tenth
+        if len(self._buckets) > self.max_keys:
+            stale = heapq.nsmallest(len(self._buckets) // 10 + 1, self._buckets.items(),
+                                    key=lambda item: item[1][1])
+            for key, _ in stale:
+                del self._buckets[key]
+
+
+class RateLimited(Exception):
+    """Raised by consume_limits and concurrency_slot when a request must wait."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Rate limited, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def get_backend():
+    app = current_app._get_current_object()
+    backend = app.extensions.get('ratelimit')
+    if backend is None:
+        backend = app.config.get('RATELIMIT_BACKEND') or MemoryBackend
+        if isinstance(backend, str):
+            backend = import_string(backend)
+        if isinstance(backend, type):
+            backend = backend()
+        app.extensions['ratelimit'] = backend
+    return backend
+
+
+def too_many_requests(retry_after):
+    retry_after = max(1, math.ceil(retry_after))
+    response = jsonify({'success': False, 'error': 'Too many requests, please retry shortly.'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+# --- Key functions: return None when the key doesn't apply to the request ---
+def key_ip():
+    return request.remote_addr
+
+def key_user():
+    return current_user.id if current_user.is_authenticated else None
+
+def key_user_ip():
+    # Before login: the account being tried from this address. Keyed on both so
+    # password guessing is slowed without letting anyone lock an account out
+    username = request.form.get('username')
+    return f'{username}@{request.remote_addr}' if username else None
+
+def key_table():
+    data = request.get_json(silent=True)
+    return data.get('table_number') if isinstance(data, dict) else None
+
+KEY_FUNCS = {'ip': key_ip, 'user': key_user, 'user_ip': key_user_ip, 'table': key_table}
+
+
+def consume_limits(name, values=None):
+    """Take a token from every bucket in RATELIMITS[name], raising RateLimited
+    when one is empty. `values` overrides key functions, e.g. {'table': 4}
+    for an order that isn't the request body."""
+    if not current_app.config.get('RATELIMIT_ENABLED', True):
+        return
+    backend = get_backend()
+    limits = current_app.config['RATELIMITS'].get(name, {})
+    restaurant_id = g.get('restaurant_id')
+    for kind, (rate, capacity) in limits.items():
+        value = values[kind] if values and kind in values else KEY_FUNCS[kind]()
+        if value is None:
+            continue
+        allowed, retry_after = backend.consume(f'{name}:{restaurant_id}:{kind}:{value}', rate, capacity)
+        if not allowed:
+            raise RateLimited(retry_after)
+
+
+def rate_limit(name, methods=('POST',), on_limit=too_many_requests):
+    """Limit a view with the buckets configured in RATELIMITS[name], e.g.
+    {'ip': (rate_per_second, burst), 'user': (...), 'table': (...)}.
+    on_limit(retry_after) builds the response for a refused request."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method in methods:
+                try:
+                    consume_limits(name)
+                except RateLimited as e:
+                    return on_limit(e.retry_after)
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+_gates_lock = threading.Lock()
+
+def get_gate(name):
+    """This worker's semaphore for CONCURRENCY_LIMITS[name], or None when unlimited."""
+    limit = current_app.config['CONCURRENCY_LIMITS'].get(name)
+    if not limit or not current_app.config.get('RATELIMIT_ENABLED', True):
+        return None
+    with _gates_lock:
+        gates = current_app.extensions.setdefault('concurrency_gates', {})
+        return gates.setdefault(name, threading.BoundedSemaphore(limit))
+
+
+@contextmanager
+def concurrency_slot(name):
+    """Hold one of the CONCURRENCY_LIMITS[name] slots for the block; raises
+    RateLimited when they are all taken."""
+    gate = get_gate(name)
+    if gate is None:
+        yield
+        return
+    if not gate.acquire(blocking=False):
+        raise RateLimited(1)
+    try:
+        yield
+    finally:
+        gate.release()
+
+
+def concurrency_limit(name, methods=None, on_limit=too_many_requests):
+    """Allow at most CONCURRENCY_LIMITS[name] requests in this view at once per
+    worker (only counting `methods`, when given); extra requests get
+    on_limit's 429 straight away instead of queueing."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            gate = get_gate(name) if methods is None or request.method in methods else None
+            if gate is None:
+                return f(*args, **kwargs)
+            if not gate.acquire(blocking=False):
+                return on_limit(1)
+            try:
+                return f(*args, **kwargs)
+            finally:
+                gate.release()
+        return decorated_function
+    return decorator
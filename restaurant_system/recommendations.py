@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Co-purchase recommendations for Restaurant Management System
+DishPair holds a sparse dish-by-dish co-occurrence matrix per restaurant: the
+number of orders containing both dishes, with the diagonal holding each dish's
+own order count. New orders update it incrementally; run this script to
+rebuild it from the full order history: python recommendations.py
+"""
+
+import os
+import sys
+from collections import Counter
+from itertools import groupby, product
+from operator import itemgetter
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import g, current_app
+from sqlalchemy.orm import aliased
+from models import (db, Dish, Order, OrderItem, ArchivedOrder, ArchivedOrderItem, DishPair,
+                    RestaurantInfo)
+from tenancy import scoped
+
+
+def _add_pair_counts(counts, order_model, item_model, restaurant_id):
+    # One pass over the order lines sorted by order; a single Core query
+    # streamed in chunks is much faster than a self-join on order_id, and
+    # skipping ORM row processing matters at millions of lines
+    connection = db.session.connection(bind_arguments={'mapper': item_model})
+    join_on = order_model.id == item_model.order_id
+    if hasattr(item_model, 'restaurant_id'):
+        # Archive rows of every restaurant may share one database (and order ids)
+        join_on &= order_model.restaurant_id == item_model.restaurant_id
+    lines = connection.execute(
+        db.select(item_model.order_id, item_model.dish_id)
+        .join(order_model, join_on)
+        .where(order_model.restaurant_id == restaurant_id)
+        .order_by(item_model.order_id)
+        .execution_options(yield_per=10000))
+    for _, order_lines in groupby(lines, key=itemgetter(0)):
+        dish_ids = sorted({dish_id for _, dish_id in order_lines})
+        counts.update(product(dish_ids, dish_ids))
+
+
+def rebuild(restaurant_id, batch_size=5000):
+    """Recompute the co-occurrence matrix for one restaurant from live and
+    archived orders. Returns the number of dish pairs stored."""
+    g.restaurant_id = restaurant_id
+    counts = Counter()
+    for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+        _add_pair_counts(counts, order_model, item_model, restaurant_id)
+
+    rows = [{'restaurant_id': restaurant_id, 'dish_id': dish_id, 'other_dish_id': other_dish_id,
+             'orders': orders}
+            for (dish_id, other_dish_id), orders in counts.items()]
+    db.session.execute(db.delete(DishPair).where(DishPair.restaurant_id == restaurant_id))
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(db.insert(DishPair), rows[start:start + batch_size])
+    db.session.commit()
+    return len(rows)
+
+
+def record_order(order):
+    """Add one order to the matrix. Call before committing the order so both
+    land in the same transaction."""
+    dish_ids = sorted({item.dish_id for item in order.items})
+    if not dish_ids:
+        return
+    pairs = list(product(dish_ids, dish_ids))
+
+    dialect = db.session.get_bind(mapper=DishPair).dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        # Atomic upsert, so concurrent orders for a new pair don't collide
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(DishPair)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['restaurant_id', 'dish_id', 'other_dish_id'],
+            set_={'orders': DishPair.orders + 1})
+        db.session.execute(stmt, [{'restaurant_id': order.restaurant_id, 'dish_id': dish_id,
+                                   'other_dish_id': other_dish_id, 'orders': 1}
+                                  for dish_id, other_dish_id in pairs])
+        return
+
+    existing = {(row.dish_id, row.other_dish_id): row for row in
+                DishPair.query.filter(DishPair.restaurant_id == order.restaurant_id,
+                                      DishPair.dish_id.in_(dish_ids),
+                                      DishPair.other_dish_id.in_(dish_ids))}
+    for dish_id, other_dish_id in pairs:
+        row = existing.get((dish_id, other_dish_id))
+        if row:
+            row.orders += 1
+        else:
+            db.session.add(DishPair(restaurant_id=order.restaurant_id, dish_id=dish_id,
+                                    other_dish_id=other_dish_id, orders=1))
+
+
+def recommended_dishes(dish, limit=None, min_support=None):
+    """Top available dishes ordered together with `dish`, best lift first.
+
+    lift(a, b) = orders(a, b) * total orders / (orders(a) * orders(b)). For a
+    fixed dish a only orders(a, b) / orders(b) changes, so that is the sort key.
+    """
+    limit = limit or current_app.config.get('RECOMMENDATION_COUNT', 4)
+    min_support = min_support or current_app.config.get('RECOMMENDATION_MIN_SUPPORT', 2)
+    own = aliased(DishPair)
+    return (scoped(Dish)
+            .join(DishPair, (DishPair.other_dish_id == Dish.id)
+                  & (DishPair.restaurant_id == Dish.restaurant_id))
+            .join(own, (own.restaurant_id == DishPair.restaurant_id)
+                  & (own.dish_id == DishPair.other_dish_id)
+                  & (own.other_dish_id == DishPair.other_dish_id))
+            .filter(DishPair.dish_id == dish.id,
+                    DishPair.other_dish_id != dish.id,
+                    DishPair.orders >= min_support,
+                    Dish.is_available == True)
+            .order_by((DishPair.orders * 1.0 / own.orders).desc(), DishPair.orders.desc())
+            .limit(limit)
+            .all())
+
+
+def run():
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        restaurant_ids = [row.id for row in RestaurantInfo.query.all()]
+        for restaurant_id in restaurant_ids:
+            pairs = rebuild(restaurant_id)
+            print(f"Restaurant {restaurant_id}: stored {pairs} dish pairs.")
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,64 @@
+# serialization.py
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+# Optional speedups: orjson for JSON, msgpack as a denser wire format.
+# Everything works with just the standard library when they aren't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider with compact output, using orjson when available."""
+
+    compact = True
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            # Dates etc. go through Flask's own default() so output matches the stdlib path
+            return orjson.dumps(obj, default=self.default,
+                                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME).decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+
+def wants_msgpack():
+    return msgpack is not None and request.accept_mimetypes.best_match(
+        ['application/json', MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE
+
+
+def encode_response(payload, status=200):
+    """Serialize `payload` as msgpack if the client asks for it and it's
+    installed, otherwise as compact JSON."""
+    if wants_msgpack():
+        return current_app.response_class(msgpack.packb(payload), status=status,
+                                          mimetype=MSGPACK_MIMETYPE)
+    response = current_app.json.response(payload)
+    response.status_code = status
+    return response
+
+
+def decode_request():
+    """Parse a msgpack or JSON request body; None if it can't be read."""
+    if request.mimetype == MSGPACK_MIMETYPE:
+        if msgpack is None:
+            return None
+        try:
+            return msgpack.unpackb(request.get_data())
+        except ValueError:
+            return None
+    return request.get_json(silent=True)
@@ -0,0 +1,59 @@
+# staff/routes.py
+from flask import Blueprint, render_template, request, jsonify, current_app, abort
+from flask_login import login_required
+from models import db, Order
+from tenancy import scoped, current_restaurant_id
+from kitchen import get_scheduler, complete_ticket, close_order_tickets
+from auth.routes import role_required
+
+staff_bp = Blueprint('staff', __name__)
+
+# Staff routes
+@staff_bp.route('/staff/dashboard')
+@login_required
+@role_required('staff')
+def staff_dashboard():
+    orders = scoped(Order).filter(Order.status != 'paid').all()
+    return render_template('staff/dashboard.html', orders=orders)
+
+@staff_bp.route('/api/order/<int:order_id>/update', methods=['POST'])
+@login_required
+@role_required('staff')
+def api_update_order_status(order_id):
+    order = scoped(Order).filter_by(id=order_id).first_or_404()
+    status = request.json.get('status')
+    
+    if status in ['preparing', 'delivered']:
+        order.status = status
+        closed = close_order_tickets(order)
+        db.session.commit()
+        get_scheduler().finished(current_restaurant_id(), closed)
+        return jsonify({'success': True})
+    
+    return jsonify({'success': False, 'error': 'Invalid status'})
+
+# Kitchen station screens: each loads only its own queue
+@staff_bp.route('/api/kitchen/<station>/tickets')
+@login_required
+@role_required('staff')
+def api_station_tickets(station):
+    if station not in current_app.config['KITCHEN_STATIONS']:
+        abort(404)
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    tickets = get_scheduler().station_view(current_restaurant_id(), station, limit)
+    return jsonify({'success': True, 'station': station, 'tickets': tickets})
+
+@staff_bp.route('/api/kitchen/tickets/<int:ticket_id>/done', methods=['POST'])
+@login_required
+@role_required('staff')
+def api_complete_ticket(ticket_id):
+    ticket = complete_ticket(ticket_id)
+    if not ticket:
+        abort(404)
+    return jsonify({'success': True})
+
+@staff_bp.route('/api/kitchen/metrics')
+@login_required
+@role_required('staff')
+def api_kitchen_metrics():
+    return jsonify({'success': True, 'stations': get_scheduler().metrics(current_restaurant_id())})
@@ -132,10 +132,22 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         }
         
+        // Reuse the same key when retrying this exact order so it is only placed once
+        const orderSignature = JSON.stringify({table: tableNumber, items: orderItems});
+        let pending = JSON.parse(localStorage.getItem('pendingOrder')) || {};
+        if (pending.signature !== orderSignature) {
+            pending = {
+                signature: orderSignature,
+                key: window.crypto && crypto.randomUUID ? crypto.randomUUID() : Date.now() + '-' + Math.random().toString(36).slice(2)
+            };
+            localStorage.setItem('pendingOrder', JSON.stringify(pending));
+        }
+        
         fetch('/api/order/place', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Idempotency-Key': pending.key
             },
             body: JSON.stringify({
                 table_number: parseInt(tableNumber),
@@ -146,6 +158,7 @@ document.addEventListener('DOMContentLoaded', function() {
         .then(data => {
             if (data.success) {
                 alert('Order placed successfully!');
+                localStorage.removeItem('pendingOrder');
                 cart = {};
                 updateCartDisplay();
                 
@@ -0,0 +1,153 @@
+# tenancy.py
+import os
+import threading
+
+import sqlalchemy as sa
+from flask import g, request, session, current_app, has_app_context, abort
+from flask_sqlalchemy.session import Session
+
+# Tables whose rows belong to one restaurant. RestaurantInfo is the tenant
+# registry itself and always stays in the main database.
+ARCHIVE_TABLES = ('archived_order', 'archived_order_item')
+TENANT_TABLES = ('user', 'dish', 'order', 'order_item', 'idempotency_key', 'dish_pair',
+                 'kitchen_ticket') + ARCHIVE_TABLES
+
+
+class TenantSession(Session):
+    """Session that sends tenant tables to the restaurant's own database file
+    when TENANT_DATABASE_URI is configured, archive tables to
+    ARCHIVE_DATABASE_URI when that is set, and everything else to the main
+    database."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            table = None
+            if mapper is not None:
+                table = sa.inspect(mapper).local_table
+            elif isinstance(clause, sa.Table):
+                table = clause
+            if table is not None:
+                engine = engine_for_table(table.name)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _state(app):
+    return app.extensions['tenancy']
+
+
+def engine_for_table(name):
+    """Return the routed engine for table `name`, or None for the main database."""
+    restaurant_id = g.get('restaurant_id')
+    if name in ARCHIVE_TABLES and current_app.config.get('ARCHIVE_DATABASE_URI'):
+        return get_engine('ARCHIVE_DATABASE_URI', restaurant_id, ARCHIVE_TABLES)
+    if name in TENANT_TABLES and restaurant_id is not None:
+        return get_engine('TENANT_DATABASE_URI', restaurant_id, TENANT_TABLES)
+    return None
+
+
+def get_engine(config_key, restaurant_id, tables):
+    """Return the engine for the database named by config[config_key] (which
+    may contain {restaurant_id}), creating it and `tables` on first use.
+    Returns None when the setting is empty."""
+    app = current_app._get_current_object()
+    template = app.config.get(config_key)
+    if not template:
+        return None
+
+    uri = template.format(restaurant_id=restaurant_id)
+    state = _state(app)
+    engine = state['engines'].get(uri)
+    if engine is not None:
+        return engine
+
+    with state['lock']:
+        engine = state['engines'].get(uri)
+        if engine is None:
+            url = sa.engine.make_url(uri)
+            # Relative SQLite paths live in the instance folder, like the main database
+            if url.drivername.startswith('sqlite') and url.database and not os.path.isabs(url.database):
+                os.makedirs(app.instance_path, exist_ok=True)
+                url = url.set(database=os.path.join(app.instance_path, url.database))
+                os.makedirs(os.path.dirname(url.database), exist_ok=True)
+            engine = sa.create_engine(url)
+            db = app.extensions['sqlalchemy']
+            db.metadata.create_all(engine, tables=[db.metadata.tables[name] for name in tables])
+            state['engines'][uri] = engine
+    return engine
+
+
+def _restaurant_exists(restaurant_id):
+    from models import db, RestaurantInfo
+
+    state = _state(current_app)
+    if restaurant_id in state['known']:
+        return True
+    if db.session.get(RestaurantInfo, restaurant_id) is None:
+        return False
+    state['known'].add(restaurant_id)
+    return True
+
+
+def resolve_restaurant():
+    """Pick the restaurant for this request: header, then query string, then
+    the one remembered in the session, then the configured default."""
+    default_id = current_app.config['DEFAULT_RESTAURANT_ID']
+    requested = request.headers.get('X-Restaurant-Id') or request.args.get('restaurant')
+    try:
+        requested = int(requested) if requested else None
+    except ValueError:
+        abort(404)
+
+    # A logged-in session belongs to the restaurant it logged in to; it can't
+    # be pointed at another one (user ids overlap between restaurants)
+    logged_in = login_restaurant_id()
+    if logged_in is not None:
+        if requested is not None and requested != logged_in:
+            abort(403)
+        restaurant_id = logged_in
+    else:
+        restaurant_id = requested or session.get('restaurant_id') or default_id
+
+    # The default restaurant may not exist yet on a fresh install (settings creates it)
+    if restaurant_id != default_id and not _restaurant_exists(restaurant_id):
+        abort(404)
+
+    g.restaurant_id = restaurant_id
+    session['restaurant_id'] = restaurant_id
+
+
+def login_restaurant_id():
+    """Restaurant of the logged-in user, from the '<restaurant_id>:<user id>'
+    id Flask-Login keeps in the session; None when nobody is logged in."""
+    user_id = session.get('_user_id')
+    if not user_id:
+        return None
+    restaurant_id, sep, _ = str(user_id).partition(':')
+    if not sep:
+        # A plain id from a session made before logins were tied to a
+        # restaurant; it can't be trusted for any of them, so log it out
+        session.pop('_user_id', None)
+        session.pop('_fresh', None)
+        return None
+    try:
+        return int(restaurant_id)
+    except ValueError:
+        return None
+
+
+def current_restaurant_id():
+    return g.restaurant_id
+
+
+def scoped(model):
+    """Query for `model` limited to the current restaurant's rows."""
+    return model.query.filter_by(restaurant_id=g.restaurant_id)
+
+
+def init_app(app):
+    app.config.setdefault('DEFAULT_RESTAURANT_ID', 1)
+    app.config.setdefault('TENANT_DATABASE_URI', None)
+    app.extensions['tenancy'] = {'engines': {}, 'known': set(), 'lock': threading.Lock()}
+    app.before_request(resolve_restaurant)
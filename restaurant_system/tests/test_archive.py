@@ -0,0 +1,75 @@
+# tests/test_archive.py
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import g
+from app import create_app
+from models import db, Order, OrderItem, ArchivedOrder, ArchivedOrderItem, RestaurantInfo
+import archive
+
+
+@pytest.fixture
+def app(tmp_path):
+    # One database per restaurant, one archive shared by all of them
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/main.db',
+        'TENANT_DATABASE_URI': f'sqlite:///{tmp_path}/restaurant_{{restaurant_id}}.db',
+        'ARCHIVE_DATABASE_URI': f'sqlite:///{tmp_path}/archive.db',
+    })
+    with app.app_context():
+        db.create_all()
+        for restaurant_id in (1, 2):
+            db.session.add(RestaurantInfo(id=restaurant_id, name=f'R{restaurant_id}', address='-'))
+        db.session.commit()
+        yield app
+
+
+def add_paid_order(restaurant_id, table_number):
+    g.restaurant_id = restaurant_id
+    order = Order(restaurant_id=restaurant_id, table_number=table_number, status='paid',
+                  created_at=datetime(2020, 1, 1), total_amount=10.0)
+    order.items.append(OrderItem(dish_id=1, quantity=1, price=10.0))
+    db.session.add(order)
+    db.session.commit()
+    return order.id
+
+
+def test_shared_archive_keeps_orders_with_the_same_id(app):
+    # Both restaurants' first order gets id 1 in their own databases
+    assert add_paid_order(1, table_number=3) == add_paid_order(2, table_number=7) == 1
+
+    for restaurant_id in (1, 2):
+        assert archive.archive_paid_orders(restaurant_id, timedelta(days=1)) == 1
+
+    assert ArchivedOrder.query.count() == 2
+    assert ArchivedOrderItem.query.count() == 2
+    for restaurant_id, table_number in ((1, 3), (2, 7)):
+        g.restaurant_id = restaurant_id
+        assert Order.query.count() == 0
+        history = archive.paid_order_history()
+        assert [(order.id, order.table_number) for order in history] == [(1, table_number)]
+        assert len(history[0].items) == 1
+        assert archive.find_order(1).table_number == table_number
+
+
+def test_history_pages_merge_live_and_archived_orders(app):
+    g.restaurant_id = 1
+    for day in range(1, 6):
+        db.session.add(Order(restaurant_id=1, table_number=day, status='paid',
+                             created_at=datetime(2020, 1, day), total_amount=0))
+    db.session.commit()
+    archive.archive_paid_orders(1, timedelta(days=1), batch_size=10)
+    for day in range(6, 9):
+        db.session.add(Order(restaurant_id=1, table_number=day, status='paid',
+                             created_at=datetime(2020, 1, day), total_amount=0))
+    db.session.commit()
+
+    g.restaurant_id = 1
+    pages = [[order.table_number for order in archive.paid_order_history(page, per_page=3)]
+             for page in (1, 2, 3)]
+    assert pages == [[8, 7, 6], [5, 4, 3], [2, 1]]